@@ -1,48 +1,105 @@
 # data_importer.py - 수정된 데이터 수집 및 저장 로직
 
+import io
+import itertools
 import os
 import pandas as pd
 import numpy as np
 import yfinance as yf
 from models import *
+from indicators import indicators_batch_nb, indicators_nb
 from datetime import datetime, timedelta
 import logging
 import concurrent.futures
 from tqdm import tqdm
-from pykrx import stock
+from pykrx.website import krx
+from sqlalchemy import case, column, delete, exists, func, select, table, text
+from sqlalchemy.dialects.postgresql import insert
 
 logger = logging.getLogger(__name__)
 
+# INSERT ... ON CONFLICT 로 여러 행을 한 번에 저장
+# 행 목록을 executemany로 넘기면 SQLAlchemy가 insertmanyvalues로
+# INSERT_PAGE_SIZE 행씩 묶어 실행 (컴파일된 문장은 캐시되어 재사용)
+def upsert_rows(session, model, rows, index_elements, update=True):
+    if not rows:
+        return
+    
+    stmt = insert(model.__table__)
+    
+    if update:
+        update_columns = [key for key in rows[0] if key not in index_elements]
+        set_ = {key: stmt.excluded[key] for key in update_columns}
+        set_['updated_at'] = func.now()
+        stmt = stmt.on_conflict_do_update(index_elements=index_elements, set_=set_)
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
+    
+    session.execute(stmt, rows)
+
+# 열별 배열({열 이름: ndarray})을 COPY ... FROM STDIN 으로 임시 테이블에 적재한 뒤
+# INSERT ... SELECT ... ON CONFLICT 로 반영 (psycopg2 copy_expert 사용)
+def copy_upsert_columns(session, model, columns, index_elements):
+    names = list(columns)
+    if not names or len(columns[names[0]]) == 0:
+        return
+    
+    target = model.__table__
+    staging_name = f"staging_{target.name}"
+    
+    # 대상 테이블과 같은 타입의 열만 가진 임시 테이블 (트랜잭션 안에서 생성/삭제)
+    session.execute(text(
+        f"CREATE TEMP TABLE {staging_name} AS "
+        f"SELECT {', '.join(names)} FROM {target.name} WITH NO DATA"
+    ))
+    
+    buffer = io.StringIO()
+    pd.DataFrame(columns).to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {staging_name} ({', '.join(names)}) FROM STDIN WITH (FORMAT CSV)", buffer)
+    finally:
+        cursor.close()
+    
+    # created_at 등 컬럼 기본값은 from_select가 함께 채움
+    staging = table(staging_name, *[column(name) for name in names])
+    stmt = insert(target).from_select(names, select(*staging.c))
+    set_ = {name: stmt.excluded[name] for name in names if name not in index_elements}
+    set_['updated_at'] = func.now()
+    session.execute(stmt.on_conflict_do_update(index_elements=index_elements, set_=set_))
+    
+    session.execute(text(f"DROP TABLE {staging_name}"))
+
 # pykrx를 사용하여 한국 주식 종목 목록 가져오기
 def get_korean_stock_symbols():
     try:
         today = datetime.now().strftime('%Y%m%d')
         
-        # KOSPI 종목 가져오기
-        kospi_tickers = stock.get_market_ticker_list(today, market="KOSPI")
-        kospi_symbols = []
-        
-        for ticker in kospi_tickers:
-            name = stock.get_market_ticker_name(ticker)
-            kospi_symbols.append({
+        # KOSPI 종목 가져오기 (티커와 종목명을 한 번의 요청으로 조회)
+        kospi_names = krx.get_market_ticker_and_name(today, market="KOSPI")
+        kospi_symbols = [
+            {
                 'symbol': f'{ticker}.KS',
                 'krx_code': ticker,
                 'name': name,
                 'market': 'KOSPI'
-            })
+            }
+            for ticker, name in kospi_names.items()
+        ]
         
         # KOSDAQ 종목 가져오기
-        kosdaq_tickers = stock.get_market_ticker_list(today, market="KOSDAQ")
-        kosdaq_symbols = []
-        
-        for ticker in kosdaq_tickers:
-            name = stock.get_market_ticker_name(ticker)
-            kosdaq_symbols.append({
+        kosdaq_names = krx.get_market_ticker_and_name(today, market="KOSDAQ")
+        kosdaq_symbols = [
+            {
                 'symbol': f'{ticker}.KQ',
                 'krx_code': ticker,
                 'name': name,
                 'market': 'KOSDAQ'
-            })
+            }
+            for ticker, name in kosdaq_names.items()
+        ]
         
         logger.info(f"종목 정보 가져오기 완료: KOSPI {len(kospi_symbols)}개, KOSDAQ {len(kosdaq_symbols)}개")
         return kospi_symbols + kosdaq_symbols
@@ -55,46 +112,55 @@ def get_korean_stock_symbols():
             {'symbol': '035420.KS', 'krx_code': '035420', 'name': 'NAVER', 'market': 'KOSPI'}
         ]
 
+# 야후 파이낸스 추가 정보 조회 병렬 처리 스레드 수
+INFO_FETCH_WORKERS = 16
+
+# 야후 파이낸스에서 종목의 섹터, 업종, 설명 가져오기
+def fetch_stock_profile(symbol):
+    try:
+        stock_info = yf.Ticker(symbol).info
+        return {
+            'sector': stock_info.get('sector', ''),
+            'industry': stock_info.get('industry', ''),
+            'description': stock_info.get('longBusinessSummary', '')
+        }
+    except Exception as e:
+        return {'sector': '', 'industry': '', 'description': ''}
+
+# 여러 종목의 추가 정보를 병렬로 조회
+def fetch_stock_profiles(symbols, max_workers=INFO_FETCH_WORKERS):
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        profiles = list(tqdm(executor.map(fetch_stock_profile, symbols), total=len(symbols), desc="종목 정보 조회"))
+    return dict(zip(symbols, profiles))
+
 # 주식 기본 정보 저장
 def save_stock_info(symbols):
     session = Session()
     try:
-        for symbol_info in tqdm(symbols, desc="종목 정보 저장"):
-            symbol = symbol_info['symbol']
-            krx_code = symbol_info['krx_code']
-            name = symbol_info['name']
-            market = symbol_info['market']
-            
-            # 이미 있는지 확인
-            existing_stock = session.query(Stock).filter_by(symbol=symbol).first()
-            
-            if existing_stock:
-                continue
-            
-            # 야후 파이낸스에서 추가 정보 가져오기
-            try:
-                stock_info = yf.Ticker(symbol).info
-                sector = stock_info.get('sector', '')
-                industry = stock_info.get('industry', '')
-                description = stock_info.get('longBusinessSummary', '')
-            except Exception as e:
-                sector = ''
-                industry = ''
-                description = ''
-            
-            # 데이터베이스에 저장
-            new_stock = Stock(
-                symbol=symbol,
-                krx_code=krx_code,
-                name=name,
-                market=market,
-                sector=sector,
-                industry=industry,
-                description=description,
-                is_active=True
-            )
-            
-            session.add(new_stock)
+        # 이미 저장된 종목은 한 번의 조회로 확인
+        existing_symbols = {row[0] for row in session.query(Stock.symbol).all()}
+        # 네트워크 조회 동안 트랜잭션을 열어두지 않음
+        session.commit()
+        
+        new_symbol_infos = [info for info in symbols if info['symbol'] not in existing_symbols]
+        
+        # 야후 파이낸스에서 추가 정보 가져오기
+        profiles = fetch_stock_profiles([info['symbol'] for info in new_symbol_infos])
+        
+        new_stocks = [
+            {
+                'symbol': info['symbol'],
+                'krx_code': info['krx_code'],
+                'name': info['name'],
+                'market': info['market'],
+                'is_active': True,
+                **profiles[info['symbol']]
+            }
+            for info in new_symbol_infos
+        ]
+        
+        # 데이터베이스에 저장 (동시에 추가된 종목은 건너뜀)
+        upsert_rows(session, Stock, new_stocks, ['symbol'], update=False)
         
         session.commit()
         logger.info(f"종목 정보 저장 완료")
@@ -104,26 +170,56 @@ def save_stock_info(symbols):
     finally:
         session.close()
 
-def fetch_stock_price(stock_id, symbol, start_date, end_date):
+# 여러 종목을 한 번의 요청으로 받아 종목별 DataFrame으로 분리
+# (fetch_stock_data는 묶음 단위로 이미 병렬 처리하므로 기본값은 threads=False)
+def download_price_chunk(symbols, start_date, end_date, threads=False):
+    df = yf.download(
+        " ".join(symbols),
+        start=start_date,
+        end=end_date,
+        group_by='ticker',
+        threads=threads,
+        auto_adjust=False,
+        progress=False
+    )
+    
+    if df is None or df.empty:
+        return {}
+    
+    # 단일 종목 요청은 yfinance 버전에 따라 MultiIndex가 아닐 수 있음
+    if not isinstance(df.columns, pd.MultiIndex):
+        return {symbols[0]: df} if len(symbols) == 1 else {}
+    
+    downloaded = set(df.columns.get_level_values(0))
+    return {
+        symbol: df[symbol].dropna(how='all')
+        for symbol in symbols
+        if symbol in downloaded
+    }
+
+# DailyPrice 레코드의 실수형 열
+PRICE_FLOAT_COLUMNS = [
+    'open_price', 'high_price', 'low_price', 'close_price', 'adjusted_close'
+]
+
+# yfinance 가격 DataFrame을 DailyPrice 열별 배열로 변환 ({열 이름: ndarray})
+def price_frame_to_columns(stock_id, df):
     try:
-        ticker = yf.Ticker(symbol)
-        df = ticker.history(start=start_date, end=end_date, auto_adjust=False)
-        
         if df is None or df.empty:
-            return []
+            return {}
 
         # Series인 경우 DataFrame으로 변환
         if isinstance(df, pd.Series):
             df = df.to_frame().T
 
-        df.reset_index(inplace=True)
+        df = df.reset_index()
         
         # 필요한 열 확인
         required_columns = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
         missing_columns = [col for col in required_columns if col not in df.columns]
         
         if missing_columns:
-            return []
+            return {}
         
         # 열 이름 변경
         rename_map = {
@@ -143,41 +239,31 @@ def fetch_stock_price(stock_id, symbol, start_date, end_date):
         if 'adjusted_close' not in df.columns:
             df['adjusted_close'] = df['close_price']
         
-        # 변화율 계산
-        df['change'] = df['adjusted_close'].diff()
-        df['change_rate'] = df['adjusted_close'].pct_change() * 100
-        
-        df.fillna(0, inplace=True)
-        
-        # 결과 포맷팅
-        result = []
-        for _, row in df.iterrows():
-            try:
-                if isinstance(row['date'], pd.Timestamp):
-                    date_value = row['date'].date()
-                else:
-                    continue
-                
-                daily_price = {
-                    'stock_id': stock_id,
-                    'date': date_value,
-                    'open_price': float(row['open_price']),
-                    'high_price': float(row['high_price']),
-                    'low_price': float(row['low_price']),
-                    'close_price': float(row['close_price']),
-                    'adjusted_close': float(row['adjusted_close']),
-                    'volume': int(row['volume']),
-                    'change': float(row['change']),
-                    'change_rate': float(row['change_rate'])
-                }
-                result.append(daily_price)
-            except Exception as e:
-                continue
-        
-        return result
+        # 날짜가 없는 행은 제외
+        df = df.dropna(subset=['date'])
+        if df.empty:
+            return {}
+        df = df.fillna(0)
+        
+        # 같은 날짜가 여러 번 오면 마지막 행만 사용
+        # (ON CONFLICT DO UPDATE는 한 문장에서 같은 행을 두 번 갱신할 수 없어 종목 전체 저장이 실패함)
+        dates = pd.to_datetime(df['date']).dt.date
+        unique_dates = ~dates.duplicated(keep='last').to_numpy()
+        df = df[unique_dates]
+        
+        # 결과 포맷팅 (열 단위 타입 변환)
+        return {
+            'stock_id': np.full(len(df), stock_id, dtype=np.int64),
+            'date': dates[unique_dates].to_numpy(dtype=object),
+            'volume': df['volume'].to_numpy(dtype=np.int64),
+            **{col: df[col].to_numpy(dtype=np.float64) for col in PRICE_FLOAT_COLUMNS}
+        }
     except Exception as e:
-        logger.error(f"가격 데이터 가져오기 오류 ({symbol}): {e}")
-        return []
+        logger.error(f"가격 데이터 변환 오류 (종목 ID: {stock_id}): {e}")
+        return {}
+
+# MarketIndex 레코드의 실수형 열
+INDEX_FLOAT_COLUMNS = ['open_index', 'high_index', 'low_index', 'close_index', 'change', 'change_rate']
 
 # 시장 지수 데이터 가져오기 및 저장 (오류 수정)
 def fetch_and_save_market_indices(db, start_date, end_date):
@@ -220,56 +306,16 @@ def fetch_and_save_market_indices(db, start_date, end_date):
             df['change_rate'] = df['close_index'].pct_change() * 100
             df.fillna(0, inplace=True)
             
-            # 저장
-            for idx, row in df.iterrows():
-                try:
-                    # 날짜 처리 수정 - DataFrame의 인덱스를 사용
-                    if isinstance(idx, pd.Timestamp):
-                        date_value = idx.date()
-                    elif hasattr(idx, 'date'):
-                        date_value = idx.date()
-                    else:
-                        # 인덱스가 아닌 경우 row에서 추출
-                        date_col = row['date']
-                        if isinstance(date_col, pd.Timestamp):
-                            date_value = date_col.date()
-                        elif hasattr(date_col, 'date'):
-                            date_value = date_col.date()
-                        else:
-                            date_value = pd.to_datetime(date_col).date()
-                    
-                    # 이미 있는지 확인
-                    existing_index = db.query(MarketIndex).filter_by(
-                        market=market_name,
-                        date=date_value
-                    ).first()
-                    
-                    if existing_index:
-                        # 기존 데이터 업데이트
-                        existing_index.open_index = row['open_index']
-                        existing_index.high_index = row['high_index']
-                        existing_index.low_index = row['low_index']
-                        existing_index.close_index = row['close_index']
-                        existing_index.volume = row['volume']
-                        existing_index.change = row['change']
-                        existing_index.change_rate = row['change_rate']
-                    else:
-                        # 새 데이터 추가
-                        new_index = MarketIndex(
-                            market=market_name,
-                            date=date_value,
-                            open_index=row['open_index'],
-                            high_index=row['high_index'],
-                            low_index=row['low_index'],
-                            close_index=row['close_index'],
-                            volume=row['volume'],
-                            change=row['change'],
-                            change_rate=row['change_rate']
-                        )
-                        db.add(new_index)
-                except Exception as e:
-                    logger.error(f"시장 지수 행 처리 오류: {e}")
-                    continue
+            # 저장할 열 구성 (열 단위 타입 변환)
+            index_data = {
+                'market': np.full(len(df), market_name, dtype=object),
+                'date': pd.to_datetime(df['date']).dt.date.to_numpy(dtype=object),
+                'volume': df['volume'].to_numpy(dtype=np.int64),
+                **{col: df[col].to_numpy(dtype=np.float64) for col in INDEX_FLOAT_COLUMNS}
+            }
+            
+            # 기존 데이터는 업데이트, 새 데이터는 추가
+            copy_upsert_columns(db, MarketIndex, index_data, ['market', 'date'])
             
             logger.info(f"{market_name} 지수 데이터 저장 완료")
         
@@ -280,24 +326,11 @@ def fetch_and_save_market_indices(db, start_date, end_date):
         logger.error(f"시장 지수 데이터 저장 오류: {e}")
         return False
 
-# 주가 데이터 저장
+# 주가 데이터 저장 (price_data: price_frame_to_columns의 열별 배열)
 def save_price_data(stock_id, price_data):
     session = Session()
     try:
-        for data in price_data:
-            existing_price = session.query(DailyPrice).filter_by(
-                stock_id=stock_id,
-                date=data['date']
-            ).first()
-            
-            if existing_price:
-                for key, value in data.items():
-                    if key != 'stock_id' and key != 'date':
-                        setattr(existing_price, key, value)
-            else:
-                new_price = DailyPrice(**data)
-                session.add(new_price)
-        
+        copy_upsert_columns(session, DailyPrice, price_data, ['stock_id', 'date'])
         session.commit()
         return True
     except Exception as e:
@@ -307,111 +340,145 @@ def save_price_data(stock_id, price_data):
     finally:
         session.close()
 
+# TechnicalIndicator 레코드의 실수형 열과 불리언 열
+INDICATOR_FLOAT_COLUMNS = [
+    'ma5', 'ma10', 'ma20', 'ma60', 'ma120',
+    'bb_upper', 'bb_middle', 'bb_lower', 'bb_width',
+    'rsi', 'macd', 'macd_signal', 'macd_hist',
+    'volume_ma20', 'volume_ratio'
+]
+INDICATOR_BOOL_COLUMNS = [
+    'is_doji', 'is_hammer', 'golden_cross', 'death_cross',
+    'bb_upper_touch', 'bb_lower_touch'
+]
+
+# 기술적 지표 계산에 쓰는 가격 열 (조회 순서와 동일)
+PRICE_FRAME_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# 기술적 지표 계산용 가격 조회문 (stock_id, date, 가격 열 순서)
+def select_indicator_prices():
+    return select(
+        DailyPrice.stock_id,
+        DailyPrice.date,
+        DailyPrice.open_price,
+        DailyPrice.high_price,
+        DailyPrice.low_price,
+        DailyPrice.adjusted_close,
+        DailyPrice.volume
+    )
+
+# 조회한 가격 행을 데이터프레임으로 변환 (열마다 연속된 float64 배열, NULL은 NaN)
+def price_rows_to_frame(rows):
+    values = np.array([row[2:] for row in rows], dtype=np.float64)
+    return pd.DataFrame({
+        'date': [row[1] for row in rows],
+        **{name: np.ascontiguousarray(values[:, i]) for i, name in enumerate(PRICE_FRAME_COLUMNS)}
+    })
+
+# 가격 데이터프레임에 기술적 지표 열 추가 (모든 계산은 연속 float64 배열 위의 Numba 커널)
+def compute_technical_indicators(df):
+    floats, flags = indicators_nb(*[np.ascontiguousarray(df[col], dtype=np.float64) for col in PRICE_FRAME_COLUMNS])
+    
+    for name, values in zip(INDICATOR_FLOAT_COLUMNS, floats):
+        df[name] = values
+    for name, values in zip(INDICATOR_BOOL_COLUMNS, flags):
+        df[name] = values
+    
+    return df
+
+# 기술적 지표 저장 (커밋은 호출자가 담당)
+# replace=True면 종목의 기존 지표를 모두 삭제 후 저장, False면 df의 날짜만 업데이트
+def save_technical_indicators(session, stock_id, df, replace=True):
+    # 저장할 열 구성 (열 단위 타입 변환)
+    indicator_data = {
+        'stock_id': np.full(len(df), stock_id, dtype=np.int64),
+        'date': df['date'].to_numpy(dtype=object),
+        **{col: df[col].to_numpy(dtype=np.float64) for col in INDICATOR_FLOAT_COLUMNS},
+        **{col: df[col].to_numpy(dtype=bool) for col in INDICATOR_BOOL_COLUMNS}
+    }
+    
+    # 기존 지표 삭제
+    if replace:
+        session.execute(delete(TechnicalIndicator).where(TechnicalIndicator.stock_id == stock_id))
+    
+    # 새 지표 저장
+    copy_upsert_columns(session, TechnicalIndicator, indicator_data, ['stock_id', 'date'])
+
+# 증분 재계산 시 since_date 이전에 함께 읽을 거래일 수
+# (MA120 창을 채우고 RSI, MACD의 EMA 초기값 영향이 1e-8 이하로 줄어드는 길이)
+INDICATOR_LOOKBACK_ROWS = 250
+
+# 종목 가격 데이터의 지문 (행 수, 마지막 날짜, 지표 계산에 쓰는 열들의 합)
+# 과거 수정주가가 바뀌어도 합이 달라지므로 재계산 대상이 됨
+def price_fingerprint(session, stock_id):
+    row = session.execute(
+        select(
+            func.count(),
+            func.max(DailyPrice.date),
+            func.sum(DailyPrice.open_price),
+            func.sum(DailyPrice.high_price),
+            func.sum(DailyPrice.low_price),
+            func.sum(DailyPrice.adjusted_close),
+            func.sum(DailyPrice.volume)
+        ).where(DailyPrice.stock_id == stock_id)
+    ).one()
+    return ':'.join(str(value) for value in row)
+
+# 종목의 기술적 지표 재계산 후 저장 (커밋은 호출자가 담당)
+# since_date가 주어지면 그 날짜 이후의 지표만 다시 계산해 업데이트
+# 전체 계산은 가격 데이터가 마지막 전체 계산 이후 바뀌지 않았으면 생략
+def refresh_technical_indicators(session, stock_id, since_date=None):
+    if since_date is None:
+        fingerprint = price_fingerprint(session, stock_id)
+        stored_fingerprint = session.execute(
+            select(IndicatorFingerprint.fingerprint).where(IndicatorFingerprint.stock_id == stock_id)
+        ).scalar()
+        # 가격이 그대로여도 지표 행이 지워졌다면 다시 계산
+        if fingerprint == stored_fingerprint and session.execute(
+            select(exists().where(TechnicalIndicator.stock_id == stock_id))
+        ).scalar():
+            return True
+    
+    query = (
+        select_indicator_prices()
+        .where(DailyPrice.stock_id == stock_id)
+        .order_by(DailyPrice.date)
+    )
+    
+    if since_date is not None:
+        lookback_start = session.execute(
+            select(DailyPrice.date)
+            .where(DailyPrice.stock_id == stock_id, DailyPrice.date < since_date)
+            .order_by(DailyPrice.date.desc())
+            .offset(INDICATOR_LOOKBACK_ROWS - 1)
+            .limit(1)
+        ).scalar()
+        
+        # 이전 데이터가 부족하면 전체 이력으로 계산
+        if lookback_start is not None:
+            query = query.where(DailyPrice.date >= lookback_start)
+    
+    price_data = session.execute(query).all()
+    
+    if not price_data:
+        return False
+    
+    df = compute_technical_indicators(price_rows_to_frame(price_data))
+    
+    if since_date is None:
+        save_technical_indicators(session, stock_id, df)
+        upsert_rows(session, IndicatorFingerprint, [{'stock_id': stock_id, 'fingerprint': fingerprint}], ['stock_id'])
+    else:
+        save_technical_indicators(session, stock_id, df[df['date'] >= since_date], replace=False)
+    return True
+
 # 기술적 지표 계산 및 저장
 def calculate_and_save_technical_indicators(stock_id):
     session = Session()
     try:
-        price_data = session.query(DailyPrice).filter_by(stock_id=stock_id).order_by(DailyPrice.date).all()
-        
-        if not price_data:
-            return False
-        
-        # 데이터프레임으로 변환
-        df = pd.DataFrame([{
-            'date': p.date,
-            'open': p.open_price,
-            'high': p.high_price,
-            'low': p.low_price,
-            'close': p.adjusted_close,
-            'volume': p.volume
-        } for p in price_data])
-        
-        # 이동평균선 계산
-        df['ma5'] = df['close'].rolling(window=5).mean()
-        df['ma10'] = df['close'].rolling(window=10).mean()
-        df['ma20'] = df['close'].rolling(window=20).mean()
-        df['ma60'] = df['close'].rolling(window=60).mean()
-        df['ma120'] = df['close'].rolling(window=120).mean()
-        
-        # 볼린저 밴드
-        bb_indicator = BollingerBands(close=df['close'], window=20, window_dev=2)
-        df['bb_upper'] = bb_indicator.bollinger_hband()
-        df['bb_middle'] = bb_indicator.bollinger_mavg()
-        df['bb_lower'] = bb_indicator.bollinger_lband()
-        df['bb_width'] = (df['bb_upper'] - df['bb_lower']) / df['bb_middle']
-        
-        # RSI
-        rsi_indicator = RSIIndicator(close=df['close'], window=14)
-        df['rsi'] = rsi_indicator.rsi()
-        
-        # MACD
-        macd_indicator = MACD(close=df['close'], window_slow=26, window_fast=12, window_sign=9)
-        df['macd'] = macd_indicator.macd()
-        df['macd_signal'] = macd_indicator.macd_signal()
-        df['macd_hist'] = macd_indicator.macd_diff()
-        
-        # 볼륨 관련
-        df['volume_ma20'] = df['volume'].rolling(window=20).mean()
-        df['volume_ratio'] = df['volume'] / df['volume_ma20'] * 100
-        
-        # 캔들 패턴
-        df['body_size'] = abs(df['close'] - df['open'])
-        df['shadow_upper'] = df['high'] - df[['open', 'close']].max(axis=1)
-        df['shadow_lower'] = df[['open', 'close']].min(axis=1) - df['low']
-        df['is_doji'] = (df['body_size'] / (df['high'] - df['low'] + 0.001) < 0.1)
-        df['is_hammer'] = ((df['shadow_lower'] > 2 * df['body_size']) & 
-                          (df['shadow_upper'] < df['body_size']) & 
-                          (df['body_size'] > 0))
-        
-        # 시그널
-        df['ma5_prev'] = df['ma5'].shift(1)
-        df['ma20_prev'] = df['ma20'].shift(1)
-        df['golden_cross'] = (df['ma5'] > df['ma20']) & (df['ma5_prev'] <= df['ma20_prev'])
-        df['death_cross'] = (df['ma5'] < df['ma20']) & (df['ma5_prev'] >= df['ma20_prev'])
-        
-        # 볼린저 밴드 터치
-        df['bb_upper_touch'] = (df['high'] >= df['bb_upper'])
-        df['bb_lower_touch'] = (df['low'] <= df['bb_lower'])
-        
-        df.fillna(0, inplace=True)
-        
-        # 기존 지표 삭제
-        session.query(TechnicalIndicator).filter_by(stock_id=stock_id).delete()
-        
-        # 새 지표 저장
-        for _, row in df.iterrows():
-            if pd.isna(row['date']):
-                continue
-                
-            new_indicator = TechnicalIndicator(
-                stock_id=stock_id,
-                date=row['date'],
-                ma5=row['ma5'],
-                ma10=row['ma10'],
-                ma20=row['ma20'],
-                ma60=row['ma60'],
-                ma120=row['ma120'],
-                bb_upper=row['bb_upper'],
-                bb_middle=row['bb_middle'],
-                bb_lower=row['bb_lower'],
-                bb_width=row['bb_width'],
-                rsi=row['rsi'],
-                macd=row['macd'],
-                macd_signal=row['macd_signal'],
-                macd_hist=row['macd_hist'],
-                volume_ma20=row['volume_ma20'],
-                volume_ratio=row['volume_ratio'],
-                is_doji=row['is_doji'],
-                is_hammer=row['is_hammer'],
-                golden_cross=row['golden_cross'],
-                death_cross=row['death_cross'],
-                bb_upper_touch=row['bb_upper_touch'],
-                bb_lower_touch=row['bb_lower_touch']
-            )
-            session.add(new_indicator)
-        
+        result = refresh_technical_indicators(session, stock_id)
         session.commit()
-        return True
+        return result
     except Exception as e:
         session.rollback()
         logger.error(f"기술적 지표 계산 오류 (종목 ID: {stock_id}): {e}")
@@ -419,35 +486,72 @@ def calculate_and_save_technical_indicators(stock_id):
     finally:
         session.close()
 
+# since_date 이후의 기술적 지표만 증분 계산 및 저장
+def calculate_and_save_technical_indicators_incremental(stock_id, since_date):
+    session = Session()
+    try:
+        result = refresh_technical_indicators(session, stock_id, since_date=since_date)
+        session.commit()
+        return result
+    except Exception as e:
+        session.rollback()
+        logger.error(f"기술적 지표 계산 오류 (종목 ID: {stock_id}): {e}")
+        return False
+    finally:
+        session.close()
+
+# 시장 통계에서 합산하는 열
+MARKET_STAT_SUM_COLUMNS = [
+    'rising_stocks', 'falling_stocks', 'unchanged_stocks',
+    'total_stocks', 'total_volume', 'total_value'
+]
+
 # 시장 통계 계산 및 저장
 def calculate_market_stats(db):
     try:
-        # 모든 날짜 가져오기
-        dates = [date[0] for date in db.query(DailyPrice.date).distinct().all()]
+        # 전일 대비 변화는 LAG 윈도 함수로 계산 (첫 거래일은 보합)
+        previous_close = func.lag(DailyPrice.adjusted_close).over(
+            partition_by=DailyPrice.stock_id,
+            order_by=DailyPrice.date
+        )
+        prices = select(
+            DailyPrice.stock_id,
+            DailyPrice.date,
+            DailyPrice.close_price,
+            DailyPrice.volume,
+            func.sign(func.coalesce(DailyPrice.adjusted_close - previous_close, 0)).label('direction')
+        ).subquery()
+        
+        # 날짜별, 시장별 통계를 한 번의 GROUP BY 쿼리로 계산
+        query = (
+            select(
+                prices.c.date,
+                Stock.market,
+                func.sum(case((prices.c.direction > 0, 1), else_=0)).label('rising_stocks'),
+                func.sum(case((prices.c.direction < 0, 1), else_=0)).label('falling_stocks'),
+                func.sum(case((prices.c.direction == 0, 1), else_=0)).label('unchanged_stocks'),
+                func.count().label('total_stocks'),
+                func.coalesce(func.sum(prices.c.volume), 0).label('total_volume'),
+                func.coalesce(func.sum(prices.c.volume * prices.c.close_price), 0).label('total_value')
+            )
+            .join(Stock, Stock.stock_id == prices.c.stock_id)
+            .where(Stock.market.in_(['KOSPI', 'KOSDAQ']))
+            .group_by(prices.c.date, Stock.market)
+        )
+        market_df = pd.DataFrame(db.execute(query).mappings().all())
         
-        for date in tqdm(dates, desc="시장 통계 계산"):
-            # KOSPI 통계
-            kospi_stats = calculate_market_stat_for_date(db, date, 'KOSPI')
-            # KOSDAQ 통계
-            kosdaq_stats = calculate_market_stat_for_date(db, date, 'KOSDAQ')
-            
-            # 전체 시장 통계
-            total_stats = {
-                'date': date,
-                'market': 'ALL',
-                'rising_stocks': kospi_stats['rising_stocks'] + kosdaq_stats['rising_stocks'],
-                'falling_stocks': kospi_stats['falling_stocks'] + kosdaq_stats['falling_stocks'],
-                'unchanged_stocks': kospi_stats['unchanged_stocks'] + kosdaq_stats['unchanged_stocks'],
-                'total_stocks': kospi_stats['total_stocks'] + kosdaq_stats['total_stocks'],
-                'total_volume': kospi_stats['total_volume'] + kosdaq_stats['total_volume'],
-                'total_value': kospi_stats['total_value'] + kosdaq_stats['total_value']
-            }
-            
-            # 저장
-            save_market_stat(db, kospi_stats)
-            save_market_stat(db, kosdaq_stats)
-            save_market_stat(db, total_stats)
+        if market_df.empty:
+            logger.info("시장 통계를 계산할 주가 데이터가 없습니다.")
+            return True
+        
+        # 전체 시장 통계
+        total_df = market_df.groupby('date', as_index=False)[MARKET_STAT_SUM_COLUMNS].sum()
+        total_df['market'] = 'ALL'
         
+        stats_df = pd.concat([market_df, total_df], ignore_index=True)
+        
+        # 저장
+        save_market_stats(db, stats_df.to_dict('records'))
         db.commit()
         logger.info("시장 통계 계산 및 저장 완료")
         return True
@@ -456,97 +560,79 @@ def calculate_market_stats(db):
         logger.error(f"시장 통계 계산 오류: {e}")
         return False
 
-# 특정 날짜, 특정 시장에 대한 통계 계산
-def calculate_market_stat_for_date(db, date, market):
-    stocks = db.query(Stock).filter_by(market=market).all()
-    stock_ids = [stock.stock_id for stock in stocks]
-    
-    prices = db.query(DailyPrice).filter(
-        DailyPrice.stock_id.in_(stock_ids),
-        DailyPrice.date == date
-    ).all()
-    
-    # 통계 계산
-    rising_stocks = sum(1 for p in prices if p.change > 0)
-    falling_stocks = sum(1 for p in prices if p.change < 0)
-    unchanged_stocks = sum(1 for p in prices if p.change == 0)
-    total_stocks = len(prices)
-    total_volume = sum(p.volume for p in prices)
-    total_value = sum(p.volume * p.close_price for p in prices)
-    
-    return {
-        'date': date,
-        'market': market,
-        'rising_stocks': rising_stocks,
-        'falling_stocks': falling_stocks,
-        'unchanged_stocks': unchanged_stocks,
-        'total_stocks': total_stocks,
-        'total_volume': total_volume,
-        'total_value': total_value
-    }
-
 # 시장 통계 저장
-def save_market_stat(db, stat_data):
-    existing_stat = db.query(MarketStat).filter_by(
-        market=stat_data['market'],
-        date=stat_data['date']
-    ).first()
-    
-    if existing_stat:
-        for key, value in stat_data.items():
-            if key != 'market' and key != 'date':
-                setattr(existing_stat, key, value)
-    else:
-        new_stat = MarketStat(**stat_data)
-        db.add(new_stat)
+def save_market_stats(db, stats):
+    upsert_rows(db, MarketStat, stats, ['market', 'date'])
+
+# 한 번의 yf.download 요청에 묶을 종목 수
+DOWNLOAD_CHUNK_SIZE = 20
 
-# 주식 데이터 가져오기 (병렬 처리)
-def fetch_stock_data(start_date, end_date, max_workers=10):
+# 주식 데이터 가져오기 (종목 묶음 단위 병렬 처리)
+# indicators_since가 주어지면 그 날짜 이후의 기술적 지표만 증분 계산
+def fetch_stock_data(start_date, end_date, max_workers=4, chunk_size=DOWNLOAD_CHUNK_SIZE, indicators_since=None):
     session = Session()
     try:
-        stocks = session.query(Stock).all()
+        stocks = [tuple(row) for row in session.query(Stock.stock_id, Stock.symbol, Stock.name).all()]
+    finally:
+        session.close()
+    
+    chunks = [stocks[i:i + chunk_size] for i in range(0, len(stocks), chunk_size)]
+    
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(process_stock_chunk, chunk, start_date, end_date, indicators_since)
+            for chunk in chunks
+        ]
         
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = []
-            
-            for stock in stocks:
-                futures.append(
-                    executor.submit(
-                        process_stock_data,
-                        stock.stock_id,
-                        stock.symbol,
-                        stock.name,
-                        start_date,
-                        end_date
-                    )
-                )
-            
-            for future in tqdm(concurrent.futures.as_completed(futures), total=len(futures), desc="종목 데이터 처리"):
-                try:
-                    result = future.result()
+        for future in tqdm(concurrent.futures.as_completed(futures), total=len(futures), desc="종목 데이터 처리"):
+            try:
+                results = future.result()
+                for result in results:
                     logger.debug(f"종목 처리 완료: {result}")
-                except Exception as e:
-                    logger.error(f"종목 처리 오류: {e}")
-        
-        logger.info("모든 종목 데이터 처리 완료")
+            except Exception as e:
+                logger.error(f"종목 처리 오류: {e}")
+    
+    logger.info("모든 종목 데이터 처리 완료")
+
+# 종목 묶음 데이터 처리: 가격 데이터는 한 번의 요청으로 받아옴
+def process_stock_chunk(stocks, start_date, end_date, indicators_since=None):
+    symbols = [symbol for _, symbol, _ in stocks]
+    
+    try:
+        frames = download_price_chunk(symbols, start_date, end_date)
+    except Exception as e:
+        logger.error(f"가격 데이터 가져오기 오류 ({', '.join(symbols)}): {e}")
+        frames = {}
+    
+    # 작업 스레드의 세션 하나를 묶음 안의 모든 종목에 재사용
+    session = WorkerSession()
+    try:
+        return [
+            save_stock_data(
+                session, stock_id, name,
+                price_frame_to_columns(stock_id, frames.get(symbol)),
+                indicators_since
+            )
+            for stock_id, symbol, name in stocks
+        ]
     finally:
         session.close()
 
-# 단일 종목 데이터 처리
-def process_stock_data(stock_id, symbol, name, start_date, end_date):
-    price_data = fetch_stock_price(stock_id, symbol, start_date, end_date)
-    
+# 가격 데이터 저장 후 기술적 지표 계산 (종목당 하나의 트랜잭션)
+def save_stock_data(session, stock_id, name, price_data, indicators_since=None):
     if not price_data:
         return f"{name}: 데이터 없음"
     
-    save_result = save_price_data(stock_id, price_data)
-    
-    if not save_result:
+    try:
+        copy_upsert_columns(session, DailyPrice, price_data, ['stock_id', 'date'])
+        refresh_technical_indicators(session, stock_id, since_date=indicators_since)
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        logger.error(f"종목 데이터 저장 오류 ({name}): {e}")
         return f"{name}: 저장 실패"
     
-    indicator_result = calculate_and_save_technical_indicators(stock_id)
-    
-    return f"{name}: 처리 완료 ({len(price_data)}개 데이터)"
+    return f"{name}: 처리 완료 ({len(price_data['date'])}개 데이터)"
 
 # 초기 데이터베이스 구축
 def build_initial_database(db, years=3):
@@ -556,6 +642,9 @@ def build_initial_database(db, years=3):
     
     logger.info(f"초기 데이터베이스 구축 시작 (기간: {start_date} ~ {end_date})")
     
+    # 수집 기간의 연도별 파티션 준비
+    create_year_partitions(today.year - years, today.year)
+    
     # 종목 정보 저장
     symbols = get_korean_stock_symbols()
     save_stock_info(symbols)
@@ -574,31 +663,92 @@ def build_initial_database(db, years=3):
 # 일일 데이터 업데이트
 def update_daily_data(db, days=2):
     today = datetime.now().date()
-    start_date = (today - timedelta(days=days)).strftime('%Y-%m-%d')
+    since_date = today - timedelta(days=days)
+    start_date = since_date.strftime('%Y-%m-%d')
     end_date = today.strftime('%Y-%m-%d')
     
     logger.info(f"일일 데이터 업데이트 시작 (기간: {start_date} ~ {end_date})")
     
+    # 수집 기간의 연도별 파티션 준비
+    create_year_partitions(since_date.year, today.year)
+    
     # 종목 정보 업데이트
     symbols = get_korean_stock_symbols()
     save_stock_info(symbols)
     
-    # 주가 데이터 업데이트
-    fetch_stock_data(start_date, end_date)
+    # 주가 데이터 업데이트 (기술적 지표는 수집 기간만 증분 계산)
+    fetch_stock_data(start_date, end_date, indicators_since=since_date)
     
     # 시장 지수 업데이트
     fetch_and_save_market_indices(db, start_date, end_date)
     
     logger.info("일일 데이터 업데이트 완료")
 
+# 서버 측 커서로 한 번에 가져올 가격 행 수
+INDICATOR_FETCH_SIZE = 50000
+
+# 전체 재계산 시 한 번의 병렬 커널 호출과 저장으로 묶을 종목 수
+INDICATOR_BATCH_STOCKS = 100
+
+# 종목, 날짜 순으로 정렬된 가격 행을 종목 묶음 [(stock_id, 행 목록), ...] 단위로 반환
+def iter_price_batches(rows, batch_size):
+    groups = itertools.groupby(rows, key=lambda row: row.stock_id)
+    while True:
+        batch = [(stock_id, list(stock_rows)) for stock_id, stock_rows in itertools.islice(groups, batch_size)]
+        if not batch:
+            return
+        yield batch
+
+# 종목 묶음의 지표를 한 번의 병렬 커널 호출로 계산해 기존 지표를 교체 (커밋은 호출자가 담당)
+def save_technical_indicators_batch(session, batch):
+    stock_ids = [stock_id for stock_id, _ in batch]
+    rows = [row for _, stock_rows in batch for row in stock_rows]
+    lengths = np.array([len(stock_rows) for _, stock_rows in batch], dtype=np.int64)
+    
+    # 종목들의 가격 열을 이어 붙이고 종목별 구간을 offsets로 표시
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    values = np.array([row[2:] for row in rows], dtype=np.float64)
+    floats, flags = indicators_batch_nb(
+        *[np.ascontiguousarray(values[:, i]) for i in range(len(PRICE_FRAME_COLUMNS))],
+        offsets
+    )
+    
+    indicator_data = {
+        'stock_id': np.repeat(np.array(stock_ids, dtype=np.int64), lengths),
+        'date': np.array([row[1] for row in rows], dtype=object),
+        **dict(zip(INDICATOR_FLOAT_COLUMNS, floats)),
+        **dict(zip(INDICATOR_BOOL_COLUMNS, flags))
+    }
+    
+    session.execute(delete(TechnicalIndicator).where(TechnicalIndicator.stock_id.in_(stock_ids)))
+    copy_upsert_columns(session, TechnicalIndicator, indicator_data, ['stock_id', 'date'])
+
 # 전체 기술적 지표 재계산
 def update_full_technical_indicators(db):
     logger.info("기술적 지표 전체 재계산 시작")
     
-    stocks = db.query(Stock).all()
+    # 전체 가격 데이터를 종목, 날짜 순으로 한 번에 스트리밍 조회
+    result = db.execute(
+        select_indicator_prices()
+        .order_by(DailyPrice.stock_id, DailyPrice.date)
+        .execution_options(yield_per=INDICATOR_FETCH_SIZE)
+    )
     
-    for stock in tqdm(stocks, desc="기술적 지표 재계산"):
-        calculate_and_save_technical_indicators(stock.stock_id)
+    # 조회 트랜잭션(서버 측 커서)과 분리된 세션으로 종목 묶음별 저장 후 커밋
+    session = Session()
+    try:
+        with tqdm(desc="기술적 지표 재계산") as progress:
+            for batch in iter_price_batches(result, INDICATOR_BATCH_STOCKS):
+                try:
+                    save_technical_indicators_batch(session, batch)
+                    session.commit()
+                except Exception as e:
+                    session.rollback()
+                    logger.error(f"기술적 지표 계산 오류 (종목 ID: {batch[0][0]}~{batch[-1][0]}): {e}")
+                progress.update(len(batch))
+    finally:
+        result.close()
+        session.close()
     
     logger.info("기술적 지표 전체 재계산 완료")
 
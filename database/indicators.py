@@ -0,0 +1,276 @@
+# indicators.py - 기술적 지표 계산용 Numba 커널
+#
+# ta 라이브러리(RSIIndicator, BollingerBands, MACD)와 동일한 값을 내도록
+# pandas의 ewm(adjust=False) / rolling(min_periods=window) 규칙을 그대로 따름
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit(cache=True)
+def ewm_nb(values, alpha, min_periods):
+    """pandas Series.ewm(alpha=alpha, adjust=False, min_periods=min_periods).mean()"""
+    n = values.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    if n == 0:
+        return out
+
+    old_wt_factor = 1.0 - alpha
+    weighted = values[0]
+    nobs = 1 if weighted == weighted else 0
+    out[0] = weighted if nobs >= min_periods else np.nan
+    old_wt = 1.0
+
+    for i in range(1, n):
+        cur = values[i]
+        is_observation = cur == cur
+        if is_observation:
+            nobs += 1
+
+        if weighted == weighted:
+            # NaN 구간에서도 기존 가중치는 감소 (ignore_na=False)
+            old_wt *= old_wt_factor
+            if is_observation:
+                if weighted != cur:
+                    weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+                old_wt = 1.0
+        elif is_observation:
+            weighted = cur
+
+        out[i] = weighted if nobs >= min_periods else np.nan
+
+    return out
+
+
+@njit(cache=True)
+def sma_nb(values, window):
+    """pandas Series.rolling(window).mean() - 보정 합(Kahan)을 갱신하는 O(N) 이동 평균"""
+    n = values.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    if n == 0:
+        return out
+
+    nobs = 0
+    neg_ct = 0
+    sum_x = 0.0
+    compensation_add = 0.0
+    compensation_remove = 0.0
+    prev_value = values[0]
+    num_consecutive_same_value = 0
+
+    for i in range(n):
+        # 창에서 빠지는 값 제거
+        if i >= window:
+            val = values[i - window]
+            if val == val:
+                nobs -= 1
+                y = -val - compensation_remove
+                t = sum_x + y
+                compensation_remove = t - sum_x - y
+                sum_x = t
+                if val < 0:
+                    neg_ct -= 1
+
+        # 새 값 추가
+        val = values[i]
+        if val == val:
+            nobs += 1
+            y = val - compensation_add
+            t = sum_x + y
+            compensation_add = t - sum_x - y
+            sum_x = t
+            if val < 0:
+                neg_ct += 1
+
+            if val == prev_value:
+                num_consecutive_same_value += 1
+            else:
+                num_consecutive_same_value = 1
+            prev_value = val
+
+        # pandas와 같이 창이 모두 유효값일 때만 계산하고, 같은 값 반복과 부호를 보정
+        if nobs >= window and nobs > 0:
+            result = sum_x / nobs
+            if num_consecutive_same_value >= nobs:
+                result = prev_value
+            elif neg_ct == 0 and result < 0:
+                result = 0.0
+            elif neg_ct == nobs and result > 0:
+                result = 0.0
+            out[i] = result
+        else:
+            out[i] = np.nan
+
+    return out
+
+
+@njit(cache=True)
+def rsi_nb(close, window):
+    """ta.momentum.RSIIndicator(close, window).rsi() - Wilder 평균 상승/하락폭"""
+    n = close.shape[0]
+    gains = np.zeros(n, dtype=np.float64)
+    losses = np.zeros(n, dtype=np.float64)
+
+    for i in range(1, n):
+        diff = close[i] - close[i - 1]
+        if diff > 0:
+            gains[i] = diff
+        elif diff < 0:
+            losses[i] = -diff
+
+    avg_gain = ewm_nb(gains, 1.0 / window, window)
+    avg_loss = ewm_nb(losses, 1.0 / window, window)
+
+    out = np.empty(n, dtype=np.float64)
+    for i in range(n):
+        if avg_loss[i] == 0:
+            out[i] = 100.0
+        else:
+            out[i] = 100.0 - 100.0 / (1.0 + avg_gain[i] / avg_loss[i])
+
+    return out
+
+
+@njit(cache=True)
+def bbands_nb(close, window, window_dev):
+    """ta.volatility.BollingerBands(close, window, window_dev) - (상단, 중간, 하단) 밴드"""
+    n = close.shape[0]
+    upper = np.full(n, np.nan)
+    middle = sma_nb(close, window)
+    lower = np.full(n, np.nan)
+
+    for i in range(window - 1, n):
+        mean = middle[i]
+        sq_sum = 0.0
+        for j in range(i - window + 1, i + 1):
+            sq_sum += (close[j] - mean) ** 2
+        # ta는 모표준편차(ddof=0)를 사용
+        std = np.sqrt(sq_sum / window)
+        upper[i] = mean + window_dev * std
+        lower[i] = mean - window_dev * std
+
+    return upper, middle, lower
+
+
+@njit(cache=True)
+def macd_nb(close, window_fast, window_slow, window_sign):
+    """ta.trend.MACD(close, window_slow, window_fast, window_sign) - (MACD, 시그널, 히스토그램)"""
+    ema_fast = ewm_nb(close, 2.0 / (window_fast + 1), window_fast)
+    ema_slow = ewm_nb(close, 2.0 / (window_slow + 1), window_slow)
+    macd = ema_fast - ema_slow
+    signal = ewm_nb(macd, 2.0 / (window_sign + 1), window_sign)
+    return macd, signal, macd - signal
+
+
+@njit(cache=True)
+def candle_signals_nb(open_, high, low, close, ma5, ma20, bb_upper, bb_lower):
+    """캔들 패턴, 이동평균 교차, 볼린저 밴드 터치를 한 번의 순회로 계산
+
+    (도지, 망치형, 골든크로스, 데드크로스, 상단 터치, 하단 터치) 불리언 배열 반환
+    """
+    n = close.shape[0]
+    is_doji = np.zeros(n, dtype=np.bool_)
+    is_hammer = np.zeros(n, dtype=np.bool_)
+    golden_cross = np.zeros(n, dtype=np.bool_)
+    death_cross = np.zeros(n, dtype=np.bool_)
+    bb_upper_touch = np.zeros(n, dtype=np.bool_)
+    bb_lower_touch = np.zeros(n, dtype=np.bool_)
+
+    for i in range(n):
+        # NaN이 섞이면 모든 비교가 False가 되어 pandas 결과와 같음
+        body_size = abs(close[i] - open_[i])
+        shadow_upper = high[i] - max(open_[i], close[i])
+        shadow_lower = min(open_[i], close[i]) - low[i]
+
+        is_doji[i] = body_size / (high[i] - low[i] + 0.001) < 0.1
+        is_hammer[i] = (
+            shadow_lower > 2 * body_size
+            and shadow_upper < body_size
+            and body_size > 0
+        )
+
+        if i > 0:
+            golden_cross[i] = ma5[i] > ma20[i] and ma5[i - 1] <= ma20[i - 1]
+            death_cross[i] = ma5[i] < ma20[i] and ma5[i - 1] >= ma20[i - 1]
+
+        bb_upper_touch[i] = high[i] >= bb_upper[i]
+        bb_lower_touch[i] = low[i] <= bb_lower[i]
+
+    return is_doji, is_hammer, golden_cross, death_cross, bb_upper_touch, bb_lower_touch
+
+
+@njit(cache=True)
+def indicators_nb(open_, high, low, close, volume):
+    """한 종목의 전체 기술적 지표 계산
+
+    (실수 지표 15행, 불리언 지표 6행) 2차원 배열 반환. 행 순서는 data_importer의
+    INDICATOR_FLOAT_COLUMNS, INDICATOR_BOOL_COLUMNS와 같고 실수 지표의 NaN은 0으로 채움
+    """
+    n = close.shape[0]
+    floats = np.empty((15, n), dtype=np.float64)
+    flags = np.empty((6, n), dtype=np.bool_)
+
+    floats[0] = sma_nb(close, 5)
+    floats[1] = sma_nb(close, 10)
+    floats[2] = sma_nb(close, 20)
+    floats[3] = sma_nb(close, 60)
+    floats[4] = sma_nb(close, 120)
+
+    # 볼린저 밴드
+    bb_upper, bb_middle, bb_lower = bbands_nb(close, 20, 2.0)
+    floats[5] = bb_upper
+    floats[6] = bb_middle
+    floats[7] = bb_lower
+    floats[8] = (bb_upper - bb_lower) / bb_middle
+
+    # RSI, MACD
+    floats[9] = rsi_nb(close, 14)
+    macd, macd_signal, macd_hist = macd_nb(close, 12, 26, 9)
+    floats[10] = macd
+    floats[11] = macd_signal
+    floats[12] = macd_hist
+
+    # 볼륨 관련
+    volume_ma20 = sma_nb(volume, 20)
+    floats[13] = volume_ma20
+    floats[14] = volume / volume_ma20 * 100
+
+    # 캔들 패턴과 시그널은 NaN을 채우기 전의 값으로 판단
+    is_doji, is_hammer, golden_cross, death_cross, bb_upper_touch, bb_lower_touch = candle_signals_nb(
+        open_, high, low, close, floats[0], floats[2], bb_upper, bb_lower
+    )
+    flags[0] = is_doji
+    flags[1] = is_hammer
+    flags[2] = golden_cross
+    flags[3] = death_cross
+    flags[4] = bb_upper_touch
+    flags[5] = bb_lower_touch
+
+    for i in range(floats.shape[0]):
+        for j in range(n):
+            if floats[i, j] != floats[i, j]:
+                floats[i, j] = 0.0
+
+    return floats, flags
+
+
+@njit(parallel=True, cache=True)
+def indicators_batch_nb(open_, high, low, close, volume, offsets):
+    """여러 종목을 이어 붙인 가격 배열의 지표를 종목별로 병렬 계산
+
+    종목 k의 구간은 [offsets[k], offsets[k + 1]). 반환 형식은 indicators_nb와 같음
+    """
+    n = close.shape[0]
+    floats = np.empty((15, n), dtype=np.float64)
+    flags = np.empty((6, n), dtype=np.bool_)
+
+    for k in prange(offsets.shape[0] - 1):
+        start = offsets[k]
+        end = offsets[k + 1]
+        stock_floats, stock_flags = indicators_nb(
+            open_[start:end], high[start:end], low[start:end], close[start:end], volume[start:end]
+        )
+        floats[:, start:end] = stock_floats
+        flags[:, start:end] = stock_flags
+
+    return floats, flags
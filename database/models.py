@@ -6,8 +6,8 @@ import numpy as np
 import yfinance as yf
 from sqlalchemy import create_engine, Column, Integer, String, Float, Date, ForeignKey, Boolean, Text, DateTime, UniqueConstraint, Index, BigInteger
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship, sessionmaker
-from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship, scoped_session, sessionmaker
+from sqlalchemy.sql import func, text
 import ta
 from ta.momentum import RSIIndicator
 from ta.volatility import BollingerBands
@@ -20,10 +20,22 @@ from tqdm import tqdm
 from pykrx import stock
 
 # 데이터베이스 연결 설정
-DB_URI = 'postgresql://nsj@localhost:5432/finance_db'
-engine = create_engine(DB_URI, echo=False, pool_size=20, max_overflow=0)
+# COPY 적재에 psycopg2의 copy_expert를 사용하므로 드라이버를 명시
+DB_URI = 'postgresql+psycopg2://nsj@localhost:5432/finance_db'
+# executemany INSERT를 여러 행 VALUES 문으로 묶을 때 한 문장에 담을 최대 행 수
+INSERT_PAGE_SIZE = 10000
+# 적재용 연결의 세션 설정
+# - synchronous_commit=off: 커밋마다 WAL fsync를 기다리지 않음 (장애 시 마지막 몇 건의
+#   커밋만 유실될 수 있고 데이터가 손상되지는 않음, 유실분은 다음 업데이트의 업서트로 복구)
+# - temp_buffers: COPY 적재용 임시 테이블을 디스크 대신 메모리에 유지
+CONNECTION_OPTIONS = '-c synchronous_commit=off -c temp_buffers=64MB'
+engine = create_engine(DB_URI, echo=False, pool_size=20, max_overflow=0,
+                       insertmanyvalues_page_size=INSERT_PAGE_SIZE,
+                       connect_args={'options': CONNECTION_OPTIONS})
 Base = declarative_base()
 Session = sessionmaker(bind=engine)
+# 병렬 수집 작업 스레드별로 하나씩 재사용하는 세션
+WorkerSession = scoped_session(Session)
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -53,17 +65,17 @@ class Stock(Base):
 class DailyPrice(Base):
     __tablename__ = 'daily_prices'
     
-    price_id = Column(Integer, primary_key=True)
+    # 파티션 키(date)는 기본키에 포함되어야 함
+    price_id = Column(Integer, primary_key=True, autoincrement=True)
     stock_id = Column(Integer, ForeignKey('stocks.stock_id', ondelete='CASCADE'), nullable=False)
-    date = Column(Date, nullable=False)
+    date = Column(Date, primary_key=True)
     open_price = Column(Float)
     high_price = Column(Float)
     low_price = Column(Float)
     close_price = Column(Float)
     adjusted_close = Column(Float)
     volume = Column(Integer)
-    change = Column(Float)
-    change_rate = Column(Float)
+    # 전일 대비 변화(change, change_rate)는 저장하지 않고 조회 시 LAG 윈도 함수로 계산
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     
@@ -72,16 +84,24 @@ class DailyPrice(Base):
     
     # 인덱스 추가
     __table_args__ = (
-        UniqueConstraint('stock_id', 'date', name='uix_stock_date'),
+        # (stock_id, date) 유니크 인덱스 - ON CONFLICT 대상이자 시장 통계(LAG 윈도 함수) 조회용
+        # 커버링 인덱스 (index-only scan 가능, 쓰기가 많은 테이블이므로 별도 인덱스를 두지 않음)
+        Index(
+            'uix_stock_date', 'stock_id', 'date', unique=True,
+            postgresql_include=['adjusted_close', 'close_price', 'volume']
+        ),
         Index('ix_daily_prices_date', 'date'),
+        # 날짜 기준 연도별 RANGE 파티션 (create_year_partitions로 생성)
+        {'postgresql_partition_by': 'RANGE (date)'},
     )
 
 class TechnicalIndicator(Base):
     __tablename__ = 'technical_indicators'
     
-    indicator_id = Column(Integer, primary_key=True)
+    # 파티션 키(date)는 기본키에 포함되어야 함
+    indicator_id = Column(Integer, primary_key=True, autoincrement=True)
     stock_id = Column(Integer, ForeignKey('stocks.stock_id', ondelete='CASCADE'), nullable=False)
-    date = Column(Date, nullable=False)
+    date = Column(Date, primary_key=True)
     
     # 이동평균선
     ma5 = Column(Float)
@@ -130,6 +150,8 @@ class TechnicalIndicator(Base):
         Index('ix_tech_indicators_date', 'date'),
         Index('ix_tech_indicators_rsi', 'rsi'),
         Index('ix_tech_indicators_volume_ratio', 'volume_ratio'),
+        # 날짜 기준 연도별 RANGE 파티션 (create_year_partitions로 생성)
+        {'postgresql_partition_by': 'RANGE (date)'},
     )
 
 class MarketIndex(Base):
@@ -176,7 +198,59 @@ class MarketStat(Base):
         Index('ix_market_stats_date', 'date'),
     )
 
+# 기술적 지표를 마지막으로 전체 계산할 때의 가격 데이터 지문 (가격이 그대로면 재계산 생략)
+class IndicatorFingerprint(Base):
+    __tablename__ = 'indicator_fingerprints'
+    
+    stock_id = Column(Integer, ForeignKey('stocks.stock_id', ondelete='CASCADE'), primary_key=True)
+    fingerprint = Column(String(200), nullable=False)
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+# 날짜 기준 RANGE 파티션 테이블
+PARTITIONED_TABLES = [DailyPrice.__tablename__, TechnicalIndicator.__tablename__]
+
+# 통계 정보(pg_class.reltuples) 기반 추정 행 수, 파티션 테이블은 파티션들의 합
+# ANALYZE 전이라 추정치가 하나도 없으면 None
+def estimate_row_count(session, table):
+    estimates = session.execute(text(
+        "SELECT c.reltuples FROM pg_class c WHERE c.relkind = 'r' AND ("
+        "c.oid = CAST(:table AS regclass) OR "
+        "c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = CAST(:table AS regclass)))"
+    ), {'table': table}).scalars().all()
+    
+    # 아직 분석되지 않은 테이블은 -1
+    analyzed = [value for value in estimates if value >= 0]
+    if not analyzed:
+        return None
+    return int(sum(analyzed))
+
+# 대량 적재 후 통계 갱신 (estimate_row_count의 추정치가 바로 최신 값이 되도록)
+def analyze_tables(session, tables):
+    for table in tables:
+        session.execute(text(f"ANALYZE {table}"))
+    session.commit()
+
 # 데이터베이스 초기화 함수
 def init_db():
     Base.metadata.create_all(engine)
-    logger.info("데이터베이스 테이블이 생성되었습니다.")
\ No newline at end of file
+    logger.info("데이터베이스 테이블이 생성되었습니다.")
+
+# 연도별 파티션 생성 (이미 있으면 건너뜀)
+def create_year_partitions(start_year, end_year):
+    with engine.begin() as conn:
+        for table in PARTITIONED_TABLES:
+            # 파티션 도입 이전에 만들어진 일반 테이블은 그대로 사용
+            is_partitioned = conn.execute(text(
+                "SELECT 1 FROM pg_partitioned_table p "
+                "JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = :table"
+            ), {'table': table}).first()
+            
+            if not is_partitioned:
+                continue
+            
+            for year in range(start_year, end_year + 1):
+                conn.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {table}_{year} PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+                ))
\ No newline at end of file
@@ -25,13 +25,15 @@ def run_task(task: str, **kwargs):
         elif task == "update":
             print("일일 데이터 업데이트를 시작합니다...")
             update_daily_data(db, days=kwargs.get('days', 2))
-            print("업데이트 완료. 기술적 지표를 전체 재계산합니다...")
-            update_full_technical_indicators(db)
-            print("시장 통계를 재계산합니다...")
+            print("업데이트 완료. 시장 통계를 재계산합니다...")
             update_market_stats(db)
             print("모든 작업 완료.")
+        elif task == "rebuild":
+            print("기술적 지표를 전체 재계산합니다...")
+            update_full_technical_indicators(db)
+            print("재계산 완료.")
         else:
-            print("잘못된 작업입니다. 'init' 또는 'update'를 사용하세요.")
+            print("잘못된 작업입니다. 'init', 'update' 또는 'rebuild'를 사용하세요.")
     except Exception as e:
         logger.error(f"작업 실행 중 오류 발생: {e}")
     finally:
@@ -47,11 +49,15 @@ if __name__ == "__main__":
         elif task_name == "update":
             days = int(sys.argv[2]) if len(sys.argv) > 2 else 2
             run_task("update", days=days)
+        elif task_name == "rebuild":
+            run_task("rebuild")
         else:
             print("사용법:")
             print("  python run_update.py init [years]    # 데이터베이스 초기화 (기본: 3년)")
             print("  python run_update.py update [days]   # 데이터 업데이트 (기본: 2일)")
+            print("  python run_update.py rebuild         # 기술적 지표 전체 재계산")
     else:
         print("사용법:")
         print("  python run_update.py init [years]    # 데이터베이스 초기화 (기본: 3년)")
-        print("  python run_update.py update [days]   # 데이터 업데이트 (기본: 2일)")
\ No newline at end of file
+        print("  python run_update.py update [days]   # 데이터 업데이트 (기본: 2일)")
+        print("  python run_update.py rebuild         # 기술적 지표 전체 재계산")
\ No newline at end of file
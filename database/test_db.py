@@ -34,19 +34,26 @@ def test_build_database():
         sample_symbols = get_sample_korean_stocks()
         print(f"샘플 종목 {len(sample_symbols)}개 저장 중...")
         
-        for symbol_info in sample_symbols:
-            symbol = symbol_info['symbol']
-            existing_stock = db.query(Stock).filter_by(symbol=symbol).first()
-            
-            if not existing_stock:
-                new_stock = Stock(
-                    symbol=symbol,
-                    krx_code=symbol_info['krx_code'],
-                    name=symbol_info['name'],
-                    market=symbol_info['market'],
-                    is_active=True
-                )
-                db.add(new_stock)
+        # 이미 저장된 종목은 한 번의 IN 조회로 확인
+        existing_symbols = {
+            row[0] for row in db.query(Stock.symbol)
+            .filter(Stock.symbol.in_([info['symbol'] for info in sample_symbols]))
+            .all()
+        }
+        
+        new_stocks = [
+            {
+                'symbol': info['symbol'],
+                'krx_code': info['krx_code'],
+                'name': info['name'],
+                'market': info['market'],
+                'is_active': True
+            }
+            for info in sample_symbols if info['symbol'] not in existing_symbols
+        ]
+        
+        # 한 번의 INSERT로 저장
+        upsert_rows(db, Stock, new_stocks, ['symbol'], update=False)
         
         db.commit()
         print("샘플 종목 저장 완료")
@@ -56,24 +63,22 @@ def test_build_database():
         start_date = (today - timedelta(days=180)).strftime('%Y-%m-%d')
         end_date = today.strftime('%Y-%m-%d')
         
+        # 수집 기간의 연도별 파티션 준비
+        create_year_partitions((today - timedelta(days=180)).year, today.year)
+        
         print(f"주가 데이터 수집 시작 (기간: {start_date} ~ {end_date})")
         
-        # 각 종목별로 데이터 수집
-        stocks = db.query(Stock).all()
-        for stock in stocks:
-            print(f"처리 중: {stock.name} ({stock.symbol})")
-            
-            # 주가 데이터 수집
-            price_data = fetch_stock_price(stock.stock_id, stock.symbol, start_date, end_date)
-            if price_data:
-                save_price_data(stock.stock_id, price_data)
-                print(f"  주가 데이터 {len(price_data)}개 저장 완료")
-                
-                # 기술적 지표 계산
-                calculate_and_save_technical_indicators(stock.stock_id)
-                print(f"  기술적 지표 계산 완료")
-            else:
-                print(f"  데이터 없음")
+        stocks = [tuple(row) for row in db.query(Stock.stock_id, Stock.symbol, Stock.name).all()]
+        # 네트워크 조회 동안 트랜잭션을 열어두지 않음
+        db.commit()
+        
+        # 전체 종목 가격을 한 번의 yf.download 호출로 수집 (종목별 요청은 yfinance가 병렬 처리)
+        frames = download_price_chunk([symbol for _, symbol, _ in stocks], start_date, end_date, threads=True)
+        
+        # 종목별 가격 저장 및 기술적 지표 계산
+        for stock_id, symbol, name in stocks:
+            price_data = price_frame_to_columns(stock_id, frames.get(symbol))
+            print(f"  {save_stock_data(db, stock_id, name, price_data)}")
         
         # 시장 지수 데이터 수집
         print("시장 지수 데이터 수집 중...")
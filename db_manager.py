@@ -7,13 +7,14 @@ import os
 # 현재 디렉토리를 Python 경로에 추가
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from database.models import Session, init_db
+from database.models import Session, init_db, estimate_row_count, analyze_tables
 from database.data_importer import (
     build_initial_database, 
     update_daily_data, 
     update_full_technical_indicators,
     update_market_stats
 )
+from sqlalchemy import func
 import logging
 
 # 로깅 설정
@@ -39,30 +40,34 @@ def print_success(message):
     """성공 메시지 출력"""
     print(f"✅ 성공: {message}")
 
-def check_database_status():
-    """데이터베이스 상태 확인"""
+def count_rows(db, model, exact=True):
+    """행 수 조회 (exact가 아니면 통계 기반 추정치, 추정치가 없으면 정확히 셈)"""
+    if not exact:
+        estimate = estimate_row_count(db, model.__tablename__)
+        if estimate is not None:
+            return f"약 {estimate:,}"
+    return f"{db.query(func.count()).select_from(model).scalar():,}"
+
+def check_database_status(exact=False):
+    """데이터베이스 상태 확인 (큰 테이블은 exact가 아니면 추정 행 수)"""
     try:
         db = Session()
         from database.models import Stock, DailyPrice, TechnicalIndicator, MarketIndex, MarketStat
         
-        stock_count = db.query(Stock).count()
-        price_count = db.query(DailyPrice).count()
-        indicator_count = db.query(TechnicalIndicator).count()
-        index_count = db.query(MarketIndex).count()
-        stat_count = db.query(MarketStat).count()
+        stock_count = db.query(func.count(Stock.stock_id)).scalar()
         
         print("\n📊 현재 데이터베이스 상태:")
         print(f"  • 종목 수: {stock_count:,}개")
-        print(f"  • 주가 데이터: {price_count:,}개")
-        print(f"  • 기술적 지표: {indicator_count:,}개")
-        print(f"  • 시장 지수: {index_count:,}개")
-        print(f"  • 시장 통계: {stat_count:,}개")
+        print(f"  • 주가 데이터: {count_rows(db, DailyPrice, exact)}개")
+        print(f"  • 기술적 지표: {count_rows(db, TechnicalIndicator, exact)}개")
+        print(f"  • 시장 지수: {count_rows(db, MarketIndex)}개")
+        print(f"  • 시장 통계: {count_rows(db, MarketStat)}개")
         
         if stock_count > 0:
-            # 최신 데이터 날짜 확인
-            latest_price = db.query(DailyPrice).order_by(DailyPrice.date.desc()).first()
-            if latest_price:
-                print(f"  • 최신 데이터: {latest_price.date}")
+            # 최신 데이터 날짜 확인 (날짜 인덱스의 최댓값만 조회)
+            latest_date = db.query(func.max(DailyPrice.date)).scalar()
+            if latest_date:
+                print(f"  • 최신 데이터: {latest_date}")
         
         db.close()
         return True
@@ -85,12 +90,15 @@ def run_task(task: str, **kwargs):
             days = kwargs.get('days', 2)
             print_status(f"일일 데이터 업데이트 시작 (최근 {days}일)")
             update_daily_data(db, days=days)
-            print_status("기술적 지표 전체 재계산 중...")
-            update_full_technical_indicators(db)
             print_status("시장 통계 재계산 중...")
             update_market_stats(db)
             print_success("모든 업데이트 완료")
             
+        elif task == "rebuild":
+            print_status("기술적 지표 전체 재계산 중...")
+            update_full_technical_indicators(db)
+            print_success("기술적 지표 전체 재계산 완료")
+            
         elif task == "test":
             print_status("빠른 테스트 실행 중...")
             from database.test_db import test_build_database
@@ -98,7 +106,7 @@ def run_task(task: str, **kwargs):
             print_success("테스트 완료")
             
         elif task == "status":
-            check_database_status()
+            check_database_status(exact=kwargs.get('exact', False))
             return
             
         else:
@@ -106,6 +114,10 @@ def run_task(task: str, **kwargs):
             print_usage()
             return
             
+        # 작업 완료 후 통계를 갱신해 상태 출력이 COUNT(*) 대신 추정치를 사용하도록 함
+        from database.models import DailyPrice, TechnicalIndicator
+        analyze_tables(db, [DailyPrice.__tablename__, TechnicalIndicator.__tablename__])
+        
         # 작업 완료 후 상태 출력
         print("\n" + "=" * 40)
         check_database_status()
@@ -121,8 +133,9 @@ def print_usage():
     print("\n📖 사용법:")
     print("  python db_manager.py init [years]     # 데이터베이스 초기화 (기본: 3년)")
     print("  python db_manager.py update [days]    # 데이터 업데이트 (기본: 2일)")
+    print("  python db_manager.py rebuild          # 기술적 지표 전체 재계산")
     print("  python db_manager.py test             # 빠른 테스트 (8개 주요 종목)")
-    print("  python db_manager.py status           # 데이터베이스 상태 확인")
+    print("  python db_manager.py status [--exact] # 데이터베이스 상태 확인 (--exact: 정확한 행 수)")
     print("\n💡 예시:")
     print("  python db_manager.py init 1           # 1년치 데이터로 초기화")
     print("  python db_manager.py update 5         # 최근 5일 데이터 업데이트")
@@ -142,10 +155,12 @@ def main():
     elif task_name == "update":
         days = int(sys.argv[2]) if len(sys.argv) > 2 else 2
         run_task("update", days=days)
+    elif task_name == "rebuild":
+        run_task("rebuild")
     elif task_name == "test":
         run_task("test")
     elif task_name == "status":
-        run_task("status")
+        run_task("status", exact="--exact" in sys.argv[2:])
     else:
         print_error(f"알 수 없는 명령어: {task_name}")
         print_usage()
@@ -1,15 +1,26 @@
 # server.py
 
-import json
+import functools
+import hashlib
+import inspect
+import threading
+from contextlib import asynccontextmanager
 from enum import Enum
-from typing import List, Optional, Any, Dict
+from typing import Annotated, Callable, List, Optional, Any, Dict
 
+import anyio
 import numpy as np
+import orjson
 import pandas as pd
 import yfinance as yf
-from fastapi import FastAPI, HTTPException, Query
+from cachetools import TTLCache
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html, get_swagger_ui_oauth2_redirect_html
+from fastapi.responses import HTMLResponse, JSONResponse, Response
+from pydantic import BaseModel, ConfigDict
 
 # ==============================================================================
 # 1. Pydantic 응답 모델(Response Models) - 최종 수정본
@@ -18,8 +29,7 @@ from pydantic import BaseModel
 class Message(BaseModel):
     message: str
     
-    class Config:
-        extra = 'forbid'
+    model_config = ConfigDict(extra='forbid')
 
 # 기본 주식 데이터 모델들을 Dict로 대체다을 사용
 StockHistoryData = Dict[str, Any]
@@ -61,16 +71,46 @@ class RecommendationType(str, Enum):
     recommendations = "recommendations"
     upgrades_downgrades = "upgrades_downgrades"
 
+# 여러 엔드포인트가 공유하는 쿼리 파라미터
+TickerQuery = Annotated[str, Query(description="조회할 주식의 티커", example="AAPL")]
+PeriodQuery = Annotated[str, Query(description="조회 기간", example="1y")]
+IntervalQuery = Annotated[str, Query(description="조회 간격", example="1d")]
+
 # ==============================================================================
 # 2. FastAPI 애플리케이션 및 헬퍼 함수 정의 - 최종 수정본
 # ==============================================================================
 
+# 작업 스레드 수 (yfinance 호출은 대부분 Yahoo 응답 대기이므로 anyio 기본값 40보다 크게)
+THREADPOOL_SIZE = 100
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 동기 엔드포인트와 캐시 미스 요청이 함께 쓰는 스레드 풀 크기 설정 (이벤트 루프 안에서만 가능)
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    yield
+
+class ORJSONResponse(JSONResponse):
+    """JSON response serialized with orjson (numpy scalars/arrays supported natively)."""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS,
+        )
+
 app = FastAPI(
     title="Yahoo Finance API Server",
     description="yfinance 라이브러리를 활용한 금융 데이터 API",
     version="1.0.0",
+    # 모든 응답을 orjson으로 직렬화
+    default_response_class=ORJSONResponse,
+    # OpenAPI 스키마와 문서 페이지는 아래에서 직접 제공 (스키마를 한 번만 직렬화)
+    openapi_url=None,
+    lifespan=lifespan,
 )
 
+OPENAPI_URL = "/openapi.json"
+
 # CORS 설정 추가 (하이퍼클로바 스튜디오 호환성)
 app.add_middleware(
     CORSMiddleware,
@@ -82,6 +122,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 응답 압축 (행마다 같은 키가 반복되는 JSON은 gzip으로 크게 줄어듦, 작은 응답은 그대로)
+GZIP_MINIMUM_SIZE = 1024  # 바이트
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
+
 # OpenAPI 3.0.3 스키마를 사용하도록 강제 설정
 def custom_openapi():
     if app.openapi_schema:
@@ -115,234 +159,391 @@ def custom_openapi():
 
 app.openapi = custom_openapi
 
+@functools.lru_cache(maxsize=1)
+def openapi_bytes() -> bytes:
+    """Serialize the OpenAPI schema once; routes are fixed after startup."""
+    return orjson.dumps(app.openapi())
+
+@app.get(OPENAPI_URL, include_in_schema=False)
+def get_openapi_json() -> Response:
+    return Response(content=openapi_bytes(), media_type="application/json")
+
+def docs_root_path(request: Request) -> str:
+    """Return the mount prefix (root_path) to put in front of the docs URLs."""
+    return request.scope.get("root_path", "").rstrip("/")
+
+# 문서 페이지는 FastAPI 기본 문서와 같이 root_path(프록시 경로 접두사)를 반영
+@app.get("/docs", include_in_schema=False)
+def get_swagger_ui(request: Request) -> HTMLResponse:
+    root_path = docs_root_path(request)
+    oauth2_redirect_url = app.swagger_ui_oauth2_redirect_url
+    return get_swagger_ui_html(
+        openapi_url=root_path + OPENAPI_URL,
+        title=f"{app.title} - Swagger UI",
+        oauth2_redirect_url=root_path + oauth2_redirect_url if oauth2_redirect_url else None,
+        init_oauth=app.swagger_ui_init_oauth,
+        swagger_ui_parameters=app.swagger_ui_parameters,
+    )
+
+if app.swagger_ui_oauth2_redirect_url:
+    @app.get(app.swagger_ui_oauth2_redirect_url, include_in_schema=False)
+    def get_swagger_ui_redirect() -> HTMLResponse:
+        return get_swagger_ui_oauth2_redirect_html()
+
+@app.get("/redoc", include_in_schema=False)
+def get_redoc(request: Request) -> HTMLResponse:
+    return get_redoc_html(openapi_url=docs_root_path(request) + OPENAPI_URL, title=f"{app.title} - ReDoc")
+
 common_responses = {
     404: {"model": Message, "description": "Ticker not found"},
     500: {"model": Message, "description": "Internal Server Error"},
 }
 
+# 유효성 확인을 통과한 Ticker 객체 캐시
+# (같은 티커의 반복 요청에서 확인용 조회를 건너뛰고, Ticker가 내부에 보관한 조회 결과를 재사용.
+#  HTTP 세션은 yfinance가 모든 Ticker에 공유하는 싱글턴으로 관리)
+TICKER_CACHE_SIZE = 10_000
+TICKER_CACHE_TTL = 3600  # 초
+_tickers = TTLCache(maxsize=TICKER_CACHE_SIZE, ttl=TICKER_CACHE_TTL)
+_tickers_lock = threading.Lock()
+
+def is_valid_ticker(company: yf.Ticker) -> bool:
+    """Check a ticker with a 1-day history probe."""
+    return not company.history(period="1d").empty
+
+def cache_ticker(company: yf.Ticker) -> None:
+    """Remember a Ticker that returned data, so later requests skip validation."""
+    with _tickers_lock:
+        # 이미 캐시된 항목은 다시 넣지 않음 (다시 넣으면 TTL이 초기화되어 Ticker에 남은
+        # info, 재무제표 등의 조회 결과가 만료되지 않고 계속 재사용됨)
+        if company.ticker not in _tickers:
+            _tickers[company.ticker] = company
+
 def get_ticker_object(ticker: str) -> yf.Ticker:
-    """Helper function to get a Ticker object and robustly check for its validity."""
-    company = yf.Ticker(ticker)
-    if company.history(period="1d").empty:
+    """Helper function to get a cached Ticker object, or a new unvalidated one."""
+    key = ticker.upper()
+    with _tickers_lock:
+        company = _tickers.get(key)
+    return company if company is not None else yf.Ticker(key)
+
+def ensure_valid_ticker(company: yf.Ticker, ticker: str) -> None:
+    """Raise 404 unless the ticker is cached or passes the 1-day history probe."""
+    with _tickers_lock:
+        if _tickers.get(company.ticker) is company:
+            return
+    
+    # 일시적인 조회 실패로 유효한 티커가 404로 고정되지 않도록 확인에 성공한 경우만 캐시
+    if not is_valid_ticker(company):
         raise HTTPException(status_code=404, detail=f"Ticker '{ticker}' not found.")
-    return company
+    cache_ticker(company)
 
-def dataframe_to_safe_json(df: Optional[pd.DataFrame]) -> List[Dict[str, Any]]:
-    """Helper function to robustly convert DataFrame to a JSON-compatible list of dicts."""
-    if df is None or df.empty:
-        return []
+def has_rows(data: Any) -> bool:
+    return data is not None and len(data) > 0
+
+def fetch_from_ticker(ticker: str, fetch: Callable[[yf.Ticker], Any], has_data: Callable[[Any], bool] = has_rows) -> Any:
+    """Run `fetch` on the ticker's Ticker object and validate the ticker from its result.
     
-    # DataFrame의 복사본 생성
-    df_copy = df.copy()
+    Data coming back proves the ticker valid, so the 1-day history probe only runs when `fetch`
+    raises or returns nothing, to tell a bad ticker (404) from a valid one without this data.
+    """
+    company = get_ticker_object(ticker)
+    try:
+        data = fetch(company)
+    except Exception:
+        ensure_valid_ticker(company, ticker)
+        raise
     
-    # 인덱스가 DatetimeIndex인 경우 Date 컬럼으로 변환
-    if isinstance(df_copy.index, pd.DatetimeIndex):
-        df_copy = df_copy.reset_index()
-        if 'Date' not in df_copy.columns and len(df_copy.columns) > 0:
-            df_copy = df_copy.rename(columns={df_copy.columns[0]: 'Date'})
+    if has_data(data):
+        cache_ticker(company)
     else:
-        df_copy = df_copy.reset_index()
-    
-    # API 모델과 필드 이름을 맞추기 위한 처리
-    # 컬럼명을 안전하게 문자열로 변환
-    df_copy.columns = [str(col).replace(' ', '_') for col in df_copy.columns]
-    
-    # Stock Splits 컬럼명을 Stock_Splits로 변경
-    if 'Stock_Splits' in df_copy.columns:
-        df_copy = df_copy.rename(columns={'Stock_Splits': 'Stock_Splits'})
+        ensure_valid_ticker(company, ticker)
+    return data
+
+# 엔드포인트 응답 캐시 (쿼리 파라미터별 결과를 일정 시간 재사용)
+RESPONSE_CACHE_SIZE = 1024
+HISTORY_CACHE_TTL = 15 * 60  # 초, 시세는 짧게 유지
+DAILY_CACHE_TTL = 24 * 60 * 60  # 초, 하루 단위로 바뀌는 정보
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """Weak comparison of an ETag against an If-None-Match header."""
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    return '*' in tags or etag.removeprefix('W/') in tags
+
+def cache_response(ttl: int):
+    """Cache an endpoint's result per query parameters for `ttl` seconds.
     
-    # 모든 NaN, NaT, inf 값을 파이썬의 None으로 변환
-    df_copy = df_copy.replace([np.inf, -np.inf], None)
-    df_copy = df_copy.where(pd.notna(df_copy), None)
+    Unexpected exceptions become a 500 HTTPException here, so endpoints need no try/except.
+    The wrapper is async: cache hits are answered on the event loop, and only misses run the
+    blocking yfinance endpoint in the threadpool, so hot tickers don't wait for a free worker
+    thread behind slow Yahoo requests. Responses carry Cache-Control and an ETag, and a
+    matching If-None-Match is answered with 304.
+    """
+    def decorator(func):
+        cache = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=ttl)
+        lock = threading.Lock()
+        cache_control = f"public, max-age={ttl}"
+        
+        @functools.wraps(func)
+        async def wrapper(http_request: Request, **params):
+            # FastAPI는 쿼리 파라미터를 키워드 인자로만 전달
+            key = tuple(sorted(params.items()))
+            with lock:
+                result = cache.get(key)
+            
+            if result is None:
+                # 예외(404, 500)는 캐시하지 않음
+                try:
+                    result = await run_in_threadpool(func, **params)
+                except HTTPException:
+                    raise
+                except Exception as e:
+                    # 엔드포인트의 예상치 못한 오류는 모두 500으로 변환 (CORS 헤더가 붙는 일반 응답 경로 유지)
+                    raise HTTPException(status_code=500, detail=str(e))
+                
+                # 본문은 캐시되는 동안 바뀌지 않으므로 ETag는 저장할 때 한 번만 계산
+                # (GZip 압축본도 같은 값을 쓰므로 약한 ETag)
+                result.headers["Cache-Control"] = cache_control
+                result.headers["ETag"] = f'W/"{hashlib.sha256(result.body).hexdigest()[:16]}"'
+                with lock:
+                    cache[key] = result
+            
+            etag = result.headers["ETag"]
+            if etag_matches(etag, http_request.headers.get("if-none-match")):
+                return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+            return result
+        
+        # FastAPI가 쿼리 파라미터와 함께 Request를 넘기도록 시그니처에 추가
+        signature = inspect.signature(func)
+        wrapper.__signature__ = signature.replace(parameters=[
+            *signature.parameters.values(),
+            inspect.Parameter("http_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+        ])
+        return wrapper
+    return decorator
+
+def iso_datetime_unit(values: np.ndarray) -> str:
+    """Pick the coarsest datetime_as_string unit that keeps every value's sub-second part."""
+    valid = values[~np.isnat(values)]
+    fraction = valid - valid.astype('datetime64[s]')
+    if not (fraction != np.timedelta64(0)).any():
+        return 's'
+    return 'us' if not (fraction % np.timedelta64(1, 'us') != np.timedelta64(0)).any() else 'ns'
+
+def format_iso_datetimes(values: pd.Series) -> np.ndarray:
+    """Format a datetime64 column the way Timestamp.isoformat() does.
     
-    records = df_copy.to_dict(orient="records")
+    Uses NumPy's C formatter instead of the per-element dt.strftime; NaT comes back as 'NaT'.
+    Precision is chosen per column, so whole-second values in a column that has
+    fractional ones also get the fractional digits.
+    """
+    if values.dt.tz is None:
+        naive = values.to_numpy()
+        return np.datetime_as_string(naive, unit=iso_datetime_unit(naive))
     
-    # 각 레코드를 순회하며 타입을 안전하게 변환
-    for record in records:
-        for key, value in record.items():
-            if value is None:
-                continue
-            elif isinstance(value, (pd.Timestamp, np.datetime64)):
-                try:
-                    if pd.notna(value):
-                        record[key] = pd.Timestamp(value).isoformat()
-                    else:
-                        record[key] = None
-                except:
-                    record[key] = None
-            elif isinstance(value, (np.int64, np.int32, np.int16, np.int8)):
-                record[key] = int(value)
-            elif isinstance(value, (np.float64, np.float32, np.float16)):
-                if np.isnan(value) or np.isinf(value):
-                    record[key] = None
-                else:
-                    record[key] = float(value)
-            elif isinstance(value, (np.bool_, bool)):
-                record[key] = bool(value)
-            elif isinstance(value, bytes):
-                record[key] = value.decode('utf-8', errors='ignore')
+    # 현지 시각 문자열에 isoformat과 같은 '+09:00' 형태의 UTC 오프셋을 붙임
+    # (오프셋은 서머타임 전후 몇 가지뿐이므로 고유값만 포맷)
+    local = values.dt.tz_localize(None).to_numpy()
+    offset_minutes = (local - values.dt.tz_convert(None).to_numpy()) // np.timedelta64(1, 'm')
+    unique_offsets, inverse = np.unique(offset_minutes, return_inverse=True)
+    offset_labels = np.array([
+        f"{'+' if minutes >= 0 else '-'}{abs(minutes) // 60:02d}:{abs(minutes) % 60:02d}"
+        for minutes in unique_offsets.tolist()
+    ])
+    return np.char.add(np.datetime_as_string(local, unit=iso_datetime_unit(local)), offset_labels[inverse.ravel()])
+
+def to_json_scalar(value: Any) -> Any:
+    """Convert a single value of an object column to a JSON-compatible Python value."""
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(value).isoformat() if pd.notna(value) else None
+    elif isinstance(value, (np.floating, float)):
+        return float(value) if np.isfinite(value) else None
+    elif isinstance(value, np.integer):
+        return int(value)
+    elif isinstance(value, np.bool_):
+        return bool(value)
+    elif isinstance(value, bytes):
+        return value.decode('utf-8', errors='ignore')
+    return value
+
+def dataframe_to_safe_json(df: Optional[pd.DataFrame], date_column: str = 'Date') -> List[Dict[str, Any]]:
+    """Helper function to robustly convert DataFrame to a JSON-compatible list of dicts.
     
-    return records
-
-def convert_to_financials_data(df: Optional[pd.DataFrame]) -> List[Dict[str, Any]]:
-    """Convert DataFrame to FinancialsData format."""
+    The index becomes a column; a DatetimeIndex without a name is labelled `date_column`.
+    """
     if df is None or df.empty:
         return []
     
-    # 인덱스가 금융 데이터 항목이고 컬럼이 연도인 경우
-    df_copy = df.copy()
-    
-    # 인덱스를 리셋하여 index 컬럼으로 만들기
-    df_copy = df_copy.reset_index()
+    # 인덱스 레벨을 앞쪽 컬럼으로 취급 (reset_index와 같은 이름 규칙을 따르되 새 DataFrame은 만들지 않음)
+    if isinstance(df.index, pd.MultiIndex):
+        index_values = [df.index.get_level_values(i) for i in range(df.index.nlevels)]
+        index_labels = [name if name is not None else f"level_{i}" for i, name in enumerate(df.index.names)]
+    else:
+        index_values = [df.index]
+        index_labels = [df.index.name if df.index.name is not None else ('index' if 'index' not in df.columns else 'level_0')]
+    labels = index_labels + list(df.columns)
     
-    # 컬럼명을 안전하겎 문자열로 변환
-    df_copy.columns = [str(col).replace(' ', '_') for col in df_copy.columns]
+    # API 모델과 필드 이름을 맞추기 위해 컬럼명을 안전하게 문자열로 변환 (Stock Splits -> Stock_Splits)
+    columns = [str(col).replace(' ', '_') for col in labels]
+    if isinstance(df.index, pd.DatetimeIndex) and date_column not in labels:
+        columns[0] = date_column
     
-    # NaN, inf 값 처리
-    df_copy = df_copy.replace([np.inf, -np.inf], None)
-    df_copy = df_copy.where(pd.notna(df_copy), None)
+    # 열의 dtype을 한 번만 확인하고 열 단위로 파이썬 리스트로 변환 (셀마다 isinstance 분기하지 않음)
+    column_lists = []
+    series = [pd.Series(values, copy=False) for values in index_values] + [df.iloc[:, i] for i in range(df.shape[1])]
+    for values in series:
+        if pd.api.types.is_datetime64_any_dtype(values):
+            column_lists.append(np.where(values.notna().to_numpy(), format_iso_datetimes(values), None).tolist())
+        elif pd.api.types.is_float_dtype(values.dtype) and isinstance(values.dtype, np.dtype):
+            # inf, -inf, NaN을 한 번에 None으로
+            arr = values.to_numpy()
+            column_lists.append(np.where(np.isfinite(arr), arr, None).tolist())
+        elif values.dtype.kind in 'iub' and isinstance(values.dtype, np.dtype):
+            # NumPy 정수/불리언 배열의 tolist는 파이썬 int/bool을 반환
+            column_lists.append(values.to_numpy().tolist())
+        else:
+            # object 및 확장 dtype(Int64, string 등): 결측값(NaN, NaT, pd.NA)은 None, 나머지는 값별 변환
+            column_lists.append([to_json_scalar(v) for v in values.astype(object).where(values.notna(), None).tolist()])
     
-    # 레코드로 변환
-    records = df_copy.to_dict(orient="records")
+    return [dict(zip(columns, row)) for row in zip(*column_lists)]
+
+# 한 번에 파이썬 객체로 변환하는 행 수 (긴 분봉 히스토리도 청크 단위로만 메모리에 올림)
+JSON_CHUNK_ROWS = 10_000
+
+def dataframe_json_response(df: Optional[pd.DataFrame], date_column: str = 'Date') -> Response:
+    """Serialize a DataFrame straight to JSON bytes.
     
-    # 각 레코드를 순회하며 타입을 안전하게 변환
-    for record in records:
-        for key, value in record.items():
-            if value is None:
-                continue
-            elif isinstance(value, (pd.Timestamp, np.datetime64)):
-                try:
-                    if pd.notna(value):
-                        record[key] = pd.Timestamp(value).isoformat()
-                    else:
-                        record[key] = None
-                except:
-                    record[key] = None
-            elif isinstance(value, (np.int64, np.int32, np.int16, np.int8)):
-                record[key] = int(value)
-            elif isinstance(value, (np.float64, np.float32, np.float16)):
-                if np.isnan(value) or np.isinf(value):
-                    record[key] = None
-                else:
-                    record[key] = float(value)
-            elif isinstance(value, (np.bool_, bool)):
-                record[key] = bool(value)
-            elif isinstance(value, bytes):
-                record[key] = value.decode('utf-8', errors='ignore')
+    Returning a Response skips FastAPI's per-row response_model validation and re-encoding;
+    response_model is still used for the OpenAPI schema. Rows are converted and encoded
+    JSON_CHUNK_ROWS at a time, so only one chunk of Python dicts is alive at once.
+    """
+    # 빈 DataFrame은 청크마다 빈 배열이 되어 이어 붙이면 '[,,]'가 되므로 바로 반환
+    if df is None or df.empty:
+        return Response(content=b"[]", media_type="application/json")
     
-    return records
+    # 청크마다 '[...]'의 괄호를 떼고 이어 붙여 하나의 JSON 배열로 만듦
+    parts = [
+        orjson.dumps(dataframe_to_safe_json(df.iloc[start:start + JSON_CHUNK_ROWS], date_column))[1:-1]
+        for start in range(0, len(df), JSON_CHUNK_ROWS)
+    ]
+    return Response(content=b"[" + b",".join(parts) + b"]", media_type="application/json")
 
 
 @app.get("/stock/history", summary="주식 과거 시세 조회", response_model=List[StockHistoryData], responses=common_responses)
+@cache_response(HISTORY_CACHE_TTL)
 def get_historical_stock_prices(
-    ticker: str = Query(..., description="조회할 주식의 티커", example="AAPL"),
-    period: str = Query("1mo", description="조회 기간", example="1y"),
-    interval: str = Query("1d", description="조회 간격", example="1d"),
+    ticker: TickerQuery,
+    period: PeriodQuery = "1mo",
+    interval: IntervalQuery = "1d",
 ):
-    try:
-        company = get_ticker_object(ticker)
-        hist_data = company.history(period=period, interval=interval)
-        return dataframe_to_safe_json(hist_data)
-    except HTTPException as e:
-        raise e
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    hist_data = fetch_from_ticker(ticker, lambda company: company.history(period=period, interval=interval))
+    return dataframe_json_response(hist_data)
+
+# 배치 시세 조회 한 번에 받을 수 있는 최대 티커 수
+BATCH_MAX_TICKERS = 100
+
+@app.get("/stock/history/batch", summary="여러 종목 과거 시세 일괄 조회", response_model=Dict[str, List[StockHistoryData]], responses=common_responses)
+@cache_response(HISTORY_CACHE_TTL)
+def get_batch_historical_stock_prices(
+    tickers: str = Query(..., description="쉼표로 구분한 조회할 주식의 티커 목록", example="AAPL,MSFT,005930.KS"),
+    period: PeriodQuery = "1mo",
+    interval: IntervalQuery = "1d",
+):
+    symbols = list(dict.fromkeys(symbol.strip().upper() for symbol in tickers.split(",") if symbol.strip()))
+    if not symbols or len(symbols) > BATCH_MAX_TICKERS:
+        raise HTTPException(status_code=400, detail=f"Provide 1-{BATCH_MAX_TICKERS} comma-separated tickers.")
+    
+    # 종목마다 history를 호출하지 않고 yf.download로 한 번에 병렬 조회 (/stock/history와 같은 수정주가와 배당/분할 포함)
+    # auto_adjust 기본값은 yfinance 버전마다 다르므로 명시
+    data = yf.download(
+        symbols, period=period, interval=interval, actions=True, auto_adjust=True,
+        group_by='ticker', threads=True, progress=False,
+    )
+    
+    # 티커별 DataFrame으로 나눔 (단일 종목 요청은 yfinance 버전에 따라 MultiIndex가 아닐 수 있음)
+    if data is None or data.empty:
+        frames = {}
+    elif not isinstance(data.columns, pd.MultiIndex):
+        frames = {symbols[0]: data} if len(symbols) == 1 else {}
+    else:
+        downloaded = set(data.columns.get_level_values(0))
+        frames = {symbol: data[symbol] for symbol in symbols if symbol in downloaded}
+    
+    # 조회에 실패했거나 데이터가 없는 티커는 빈 리스트
+    result = {}
+    for symbol in symbols:
+        # 종목마다 거래일이 달라 합쳐진 날짜 중 해당 종목에 없는 행은 모두 NaN
+        frame = frames[symbol].dropna(how='all') if symbol in frames else None
+        if frame is not None and 'Volume' in frame.columns and frame['Volume'].notna().all():
+            # NaN 때문에 실수가 된 거래량을 /stock/history와 같이 정수로 되돌림
+            frame = frame.astype({'Volume': 'int64'})
+        result[symbol] = dataframe_to_safe_json(frame)
+    return ORJSONResponse(content=result)
 
 @app.get("/stock/info", summary="주식 종합 정보 조회", response_model=StockInfoData, responses=common_responses)
-def get_stock_info(ticker: str = Query(..., description="조회할 주식의 티커", example="AAPL")):
-    try:
-        company = get_ticker_object(ticker)
-        return company.info
-    except HTTPException as e:
-        raise e
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+@cache_response(DAILY_CACHE_TTL)
+def get_stock_info(ticker: TickerQuery):
+    # yfinance는 잘못된 티커에도 빈 dict가 아닌 값을 줄 수 있으므로 symbol 유무로 판단
+    info = fetch_from_ticker(ticker, lambda company: company.info, lambda info: bool(info and info.get('symbol')))
+    # 약 200개 키의 dict를 한 번만 직렬화해 캐시 (캐시 적중 시 검증/재직렬화 없음)
+    return ORJSONResponse(content=info)
 
 # 뉴스 API 삭제됨 - yfinance의 뉴스 기능이 안정적이지 않음
 
 @app.get("/stock/actions", summary="주식 활동(배당, 분할) 조회", response_model=List[StockActionData], responses=common_responses)
-def get_stock_actions(ticker: str = Query(..., description="조회할 주식의 티커", example="AAPL")):
-    try:
-        company = get_ticker_object(ticker)
-        return dataframe_to_safe_json(company.actions)
-    except HTTPException as e:
-        raise e
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+@cache_response(DAILY_CACHE_TTL)
+def get_stock_actions(ticker: TickerQuery):
+    return dataframe_json_response(fetch_from_ticker(ticker, lambda company: company.actions))
 
 @app.get("/stock/financials", summary="재무제표 조회", response_model=List[FinancialsData], responses=common_responses)
+@cache_response(DAILY_CACHE_TTL)
 def get_financial_statement(
-    ticker: str = Query(..., description="조회할 주식의 티커", example="AAPL"),
+    ticker: TickerQuery,
     financial_type: FinancialType = Query(..., description="조회할 재무제표 종류", example="income_stmt"),
 ):
-    try:
-        company = get_ticker_object(ticker)
-        statement_map = {
-            "income_stmt": company.income_stmt,
-            "quarterly_income_stmt": company.quarterly_income_stmt,
-            "balance_sheet": company.balance_sheet,
-            "quarterly_balance_sheet": company.quarterly_balance_sheet,
-            "cashflow": company.cashflow,
-            "quarterly_cashflow": company.quarterly_cashflow,
-        }
-        return dataframe_to_safe_json(statement_map.get(financial_type.value))
-    except HTTPException as e:
-        raise e
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # Enum 값이 yfinance Ticker의 속성 이름과 같으므로 요청한 재무제표만 조회
+    return dataframe_json_response(fetch_from_ticker(ticker, lambda company: getattr(company, financial_type.value)))
 
 
 @app.get("/stock/holders", summary="주주 정보 조회", response_model=List[HolderData], responses=common_responses)
+@cache_response(DAILY_CACHE_TTL)
 def get_holder_info(
-    ticker: str = Query(..., description="조회할 주식의 티커", example="AAPL"),
+    ticker: TickerQuery,
     holder_type: HolderType = Query(..., description="조회할 주주 정보 종류", example="major_holders"),
 ):
-    try:
-        company = get_ticker_object(ticker)
-        holder_map = {
-            "major_holders": company.major_holders,
-            "institutional_holders": company.institutional_holders,
-            "mutualfund_holders": company.mutualfund_holders,
-            "insider_transactions": company.insider_transactions,
-            "insider_purchases": company.insider_purchases,
-            "insider_roster_holders": company.insider_roster_holders,
-        }
-        return dataframe_to_safe_json(holder_map.get(holder_type.value))
-    except HTTPException as e:
-        raise e
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # Enum 값이 yfinance Ticker의 속성 이름과 같으므로 요청한 주주 정보만 조회
+    return dataframe_json_response(fetch_from_ticker(ticker, lambda company: getattr(company, holder_type.value)))
 
 
 # 옵션 관련 API는 타입 변환 문제로 인해 제거됨
 
 
 @app.get("/stock/recommendations", summary="애널리스트 추천 정보 조회", response_model=List[RecommendationData], responses=common_responses)
+@cache_response(DAILY_CACHE_TTL)
 def get_recommendations(
-    ticker: str = Query(..., description="조회할 주식의 티커", example="AAPL"),
+    ticker: TickerQuery,
     recommendation_type: RecommendationType = Query("recommendations", description="조회할 추천 정보 종류", example="upgrades_downgrades"),
     months_back: int = Query(12, description="upgrades_downgrades 조회 시, 과거 몇 개월까지의 데이터를 볼지 설정", ge=1),
 ):
-    try:
-        company = get_ticker_object(ticker)
-        if recommendation_type == RecommendationType.recommendations:
-            recs = company.recommendations
-        else: # upgrades_downgrades
-            recs = company.upgrades_downgrades
-            if not recs.empty and 'GradeDate' in recs.columns:
-                recs = recs.copy()
-                recs['GradeDate'] = pd.to_datetime(recs['GradeDate'], utc=True)
-                cutoff_date = pd.Timestamp.now(tz='UTC') - pd.DateOffset(months=months_back)
-                recs = recs[recs["GradeDate"] >= cutoff_date]
-        
-        if not recs.empty:
-            if 'GradeDate' in recs.columns:
-                recs = recs.sort_values("GradeDate", ascending=False)
-            return dataframe_to_safe_json(recs)
-        else:
-            return []
-        
-    except HTTPException as e:
-        raise e
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+    if recommendation_type == RecommendationType.recommendations:
+        recs = fetch_from_ticker(ticker, lambda company: company.recommendations)
+    else: # upgrades_downgrades
+        recs = fetch_from_ticker(ticker, lambda company: company.upgrades_downgrades)
+        cutoff_date = pd.Timestamp.now(tz='UTC') - pd.DateOffset(months=months_back)
+        if isinstance(recs.index, pd.DatetimeIndex) and recs.index.name == 'GradeDate':
+            # yfinance는 GradeDate를 최신순으로 정렬된 인덱스로 반환하므로 이진 탐색 슬라이스로 자름
+            # (캐시된 Ticker의 DataFrame은 수정하지 않음)
+            if not recs.index.is_monotonic_decreasing:
+                recs = recs.sort_index(ascending=False)
+            if recs.index.tz is None:
+                cutoff_date = cutoff_date.tz_localize(None)
+            recs = recs.loc[:cutoff_date]
+        elif not recs.empty and 'GradeDate' in recs.columns:
+            # 이전 버전의 yfinance는 GradeDate를 컬럼으로 반환
+            grade_dates = pd.to_datetime(recs['GradeDate'], utc=True)
+            mask = np.asarray(grade_dates >= cutoff_date)
+            recs = recs.loc[mask].assign(GradeDate=grade_dates[mask])
+            recs = recs.sort_values("GradeDate", ascending=False)
+    
+    return dataframe_json_response(recs)